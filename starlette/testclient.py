@@ -1,16 +1,25 @@
 import asyncio
+import functools
 import http
 import inspect
 import io
 import json
 import queue
+import sys
 import threading
 import types
 import typing
+import warnings
+import weakref
 from urllib.parse import unquote, urljoin, urlsplit
 
 import requests
 
+if sys.version_info >= (3, 7):  # pragma: no cover
+    from asyncio import current_task
+else:  # pragma: no cover
+    current_task = asyncio.Task.current_task
+
 from starlette.types import Message, Receive, Scope, Send
 from starlette.websockets import WebSocketDisconnect
 
@@ -45,7 +54,7 @@ class _MockOriginalResponse:
     it was made using urllib3.
     """
 
-    def __init__(self, headers: typing.List[typing.Tuple[bytes, bytes]]) -> None:
+    def __init__(self, headers: typing.List[typing.Tuple[str, str]]) -> None:
         self.msg = _HeaderDict(headers)
         self.closed = False
 
@@ -53,16 +62,64 @@ class _MockOriginalResponse:
         return self.closed
 
 
+# Used when the app fails before starting a response and server exceptions
+# aren't raised. Nothing mutates the headers or the mock original response,
+# so every such response can share them.
+_SERVER_ERROR_RAW_KWARGS: typing.Dict[str, typing.Any] = {
+    "version": 11,
+    "status": 500,
+    "reason": "Internal Server Error",
+    "headers": [],
+    "preload_content": False,
+    "original_response": _MockOriginalResponse([]),
+}
+
+
 class _Upgrade(Exception):
     def __init__(self, session: "WebSocketTestSession") -> None:
         self.session = session
 
 
+# URLs that `urljoin()` would return unchanged, so joining them can be skipped.
+_ABSOLUTE_URL_PREFIXES = ("http://", "https://", "ws://", "wss://")
+
+_DEFAULT_PORTS = {"http": 80, "ws": 80, "https": 443, "wss": 443}
+
+
+@functools.lru_cache(maxsize=256)
+def _host_header(host: str, port: int, default_port: int) -> bytes:
+    if port == default_port:
+        return host.encode()
+    return f"{host}:{port}".encode()
+
+
+def _build_headers(
+    request_headers: "requests.structures.CaseInsensitiveDict[str]",
+    host: str,
+    port: int,
+    default_port: int,
+) -> typing.List[typing.Tuple[bytes, bytes]]:
+    # Include the 'host' header.
+    if "host" in request_headers:
+        headers: typing.List[typing.Tuple[bytes, bytes]] = []
+    else:
+        headers = [(b"host", _host_header(host, port, default_port))]
+
+    # Include other request headers. `lower_items()` reads the lowercased names
+    # that the dict already stores, where `items()` would look up every key
+    # again through the case-insensitive `__getitem__`.
+    headers += [
+        (key.encode("ascii"), value.encode("latin-1"))
+        for key, value in request_headers.lower_items()
+    ]
+    return headers
+
+
+_REASON_PHRASES = {status.value: status.phrase for status in http.HTTPStatus}
+
+
 def _get_reason_phrase(status_code: int) -> str:
-    try:
-        return http.HTTPStatus(status_code).phrase
-    except ValueError:
-        return ""
+    return _REASON_PHRASES.get(status_code, "")
 
 
 def _is_asgi3(app: typing.Union[ASGI2App, ASGI3App]) -> bool:
@@ -70,10 +127,41 @@ def _is_asgi3(app: typing.Union[ASGI2App, ASGI3App]) -> bool:
         return hasattr(app, "__await__")
     elif inspect.isfunction(app):
         return asyncio.iscoroutinefunction(app)
-    call = getattr(app, "__call__", None)
+    return _is_asgi3_callable_type(type(app))  # type: ignore[arg-type]
+
+
+@functools.lru_cache(maxsize=1024)
+def _is_asgi3_callable_type(app_type: type) -> bool:
+    # Calling an instance always goes through `type(app).__call__`, so the
+    # result only depends on the type and can be cached.
+    call = getattr(app_type, "__call__", None)
     return asyncio.iscoroutinefunction(call)
 
 
+def _get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the current thread's event loop, installing a new one if the thread
+    doesn't have one yet or its loop has been closed. Every request made from
+    a thread, and the lifespan of a client used as a context manager, then
+    runs on the same loop.
+    """
+    loop: typing.Optional[asyncio.AbstractEventLoop]
+    with warnings.catch_warnings():
+        # Looking up the current loop is deprecated in various ways on newer
+        # Pythons, when no loop is running or none has been set, and the
+        # policy API itself from 3.14. The test client still needs to reuse
+        # the loop the caller has installed, if any.
+        warnings.simplefilter("ignore", DeprecationWarning)
+        try:
+            loop = asyncio.get_event_loop_policy().get_event_loop()
+        except RuntimeError:
+            loop = None
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+    return loop
+
+
 class _WrapASGI2:
     """
     Provide an ASGI3 interface onto an ASGI2 app.
@@ -98,11 +186,10 @@ class _ASGIAdapter(requests.adapters.HTTPAdapter):
     def send(
         self, request: requests.PreparedRequest, *args: typing.Any, **kwargs: typing.Any
     ) -> requests.Response:
-        scheme, netloc, path, query, fragment = (
-            str(item) for item in urlsplit(request.url)
-        )
+        url = typing.cast(str, request.url)
+        scheme, netloc, path, query, fragment = urlsplit(url)
 
-        default_port = {"http": 80, "ws": 80, "https": 443, "wss": 443}[scheme]
+        default_port = _DEFAULT_PORTS[scheme]
 
         if ":" in netloc:
             host, port_string = netloc.split(":", 1)
@@ -111,19 +198,11 @@ class _ASGIAdapter(requests.adapters.HTTPAdapter):
             host = netloc
             port = default_port
 
-        # Include the 'host' header.
-        if "host" in request.headers:
-            headers: typing.List[typing.Tuple[bytes, bytes]] = []
-        elif port == default_port:
-            headers = [(b"host", host.encode())]
-        else:
-            headers = [(b"host", (f"{host}:{port}").encode())]
+        headers = _build_headers(request.headers, host, port, default_port)
 
-        # Include other request headers.
-        headers += [
-            (key.lower().encode(), value.encode())
-            for key, value in request.headers.items()
-        ]
+        # Most test URLs have nothing to percent-decode.
+        if "%" in path:
+            path = unquote(path)
 
         if scheme in {"ws", "wss"}:
             subprotocol = request.headers.get("sec-websocket-protocol", None)
@@ -133,7 +212,7 @@ class _ASGIAdapter(requests.adapters.HTTPAdapter):
                 subprotocols = [value.strip() for value in subprotocol.split(",")]
             scope = {
                 "type": "websocket",
-                "path": unquote(path),
+                "path": path,
                 "root_path": self.root_path,
                 "scheme": scheme,
                 "query_string": query.encode(),
@@ -149,7 +228,7 @@ class _ASGIAdapter(requests.adapters.HTTPAdapter):
             "type": "http",
             "http_version": "1.1",
             "method": request.method,
-            "path": unquote(path),
+            "path": path,
             "root_path": self.root_path,
             "scheme": scheme,
             "query_string": query.encode(),
@@ -159,37 +238,44 @@ class _ASGIAdapter(requests.adapters.HTTPAdapter):
             "extensions": {"http.response.template": {}},
         }
 
+        loop = _get_event_loop()
+
         request_complete = False
         response_started = False
         response_complete = False
-        raw_kwargs: typing.Dict[str, typing.Any] = {"body": io.BytesIO()}
+        response_complete_event = asyncio.Event()
+        raw_kwargs: typing.Dict[str, typing.Any] = {}
+        body_chunks: typing.List[bytes] = []
         template = None
         context = None
 
+        # Work out the request body once, rather than on every `receive()`.
+        body = request.body
+        generator: typing.Optional[typing.Generator] = None
+        body_bytes = b""
+        if isinstance(body, str):
+            body_bytes = body.encode("utf-8")
+        elif isinstance(body, types.GeneratorType):
+            generator = body
+        elif body is not None:
+            body_bytes = body
+
         async def receive() -> Message:
-            nonlocal request_complete, response_complete
+            nonlocal request_complete
 
             if request_complete:
-                while not response_complete:
-                    await asyncio.sleep(0.0001)
+                await response_complete_event.wait()
                 return {"type": "http.disconnect"}
 
-            body = request.body
-            if isinstance(body, str):
-                body_bytes: bytes = body.encode("utf-8")
-            elif body is None:
-                body_bytes = b""
-            elif isinstance(body, types.GeneratorType):
+            if generator is not None:
                 try:
-                    chunk = body.send(None)
+                    chunk = generator.send(None)
                     if isinstance(chunk, str):
                         chunk = chunk.encode("utf-8")
                     return {"type": "http.request", "body": chunk, "more_body": True}
                 except StopIteration:
                     request_complete = True
                     return {"type": "http.request", "body": b""}
-            else:
-                body_bytes = body
 
             request_complete = True
             return {"type": "http.request", "body": body_bytes}
@@ -204,12 +290,14 @@ class _ASGIAdapter(requests.adapters.HTTPAdapter):
                 raw_kwargs["version"] = 11
                 raw_kwargs["status"] = message["status"]
                 raw_kwargs["reason"] = _get_reason_phrase(message["status"])
-                raw_kwargs["headers"] = [
-                    (key.decode(), value.decode()) for key, value in message["headers"]
+                response_headers = [
+                    (key.decode("latin-1"), value.decode("latin-1"))
+                    for key, value in message["headers"]
                 ]
+                raw_kwargs["headers"] = response_headers
                 raw_kwargs["preload_content"] = False
                 raw_kwargs["original_response"] = _MockOriginalResponse(
-                    raw_kwargs["headers"]
+                    response_headers
                 )
                 response_started = True
             elif message["type"] == "http.response.body":
@@ -222,20 +310,14 @@ class _ASGIAdapter(requests.adapters.HTTPAdapter):
                 body = message.get("body", b"")
                 more_body = message.get("more_body", False)
                 if request.method != "HEAD":
-                    raw_kwargs["body"].write(body)
+                    body_chunks.append(body)
                 if not more_body:
-                    raw_kwargs["body"].seek(0)
                     response_complete = True
+                    response_complete_event.set()
             elif message["type"] == "http.response.template":
                 template = message["template"]
                 context = message["context"]
 
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
         try:
             loop.run_until_complete(self.app(scope, receive, send))
         except BaseException as exc:
@@ -245,16 +327,14 @@ class _ASGIAdapter(requests.adapters.HTTPAdapter):
         if self.raise_server_exceptions:
             assert response_started, "TestClient did not receive any response."
         elif not response_started:
-            raw_kwargs = {
-                "version": 11,
-                "status": 500,
-                "reason": "Internal Server Error",
-                "headers": [],
-                "preload_content": False,
-                "original_response": _MockOriginalResponse([]),
-                "body": io.BytesIO(),
-            }
+            raw_kwargs = dict(_SERVER_ERROR_RAW_KWARGS)
 
+        # Build the body in one go once the response is complete. A single
+        # chunk is joined without copying, and `BytesIO` shares the initial
+        # bytes until written to, so the common case copies nothing.
+        raw_kwargs["body"] = io.BytesIO(
+            b"".join(body_chunks) if response_complete else b""
+        )
         raw = requests.packages.urllib3.HTTPResponse(**raw_kwargs)
         response = self.build_response(request, raw)
         if template is not None:
@@ -263,16 +343,67 @@ class _ASGIAdapter(requests.adapters.HTTPAdapter):
         return response
 
 
+_websocket_loop: typing.Optional[asyncio.AbstractEventLoop] = None
+_websocket_loop_lock = threading.Lock()
+
+
+# Maps each task an application started to the task set of its session.
+_websocket_task_sessions: "weakref.WeakKeyDictionary[asyncio.Task, set]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _websocket_task_factory(
+    loop: asyncio.AbstractEventLoop, coro: typing.Any, **kwargs: typing.Any
+) -> "asyncio.Task[typing.Any]":
+    # Record every task an application starts, along with the tasks those
+    # start in turn, so that they can be cancelled once the session ends, as
+    # if the session had its own event loop.
+    task = asyncio.Task(coro, loop=loop, **kwargs)
+    parent = current_task(loop)
+    if parent is not None:
+        session_tasks = _websocket_task_sessions.get(parent)
+        if session_tasks is not None:
+            session_tasks.add(task)
+            task.add_done_callback(session_tasks.discard)
+            _websocket_task_sessions[task] = session_tasks
+    return task
+
+
+def _run_websocket_loop(loop: asyncio.AbstractEventLoop) -> None:
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def _get_websocket_loop() -> asyncio.AbstractEventLoop:
+    """
+    Return the event loop that websocket test sessions run on, starting it
+    in a daemon thread on first use. The loop is shared by every session
+    so that opening a connection doesn't need a new thread and event loop.
+    """
+    global _websocket_loop
+    with _websocket_loop_lock:
+        if _websocket_loop is None:
+            loop = asyncio.new_event_loop()
+            loop.set_task_factory(_websocket_task_factory)
+            thread = threading.Thread(
+                target=_run_websocket_loop, args=(loop,), daemon=True
+            )
+            thread.start()
+            _websocket_loop = loop
+    return _websocket_loop
+
+
 class WebSocketTestSession:
     def __init__(self, app: ASGI3App, scope: Scope) -> None:
         self.app = app
         self.scope = scope
         self.accepted_subprotocol = None
-        self._receive_queue: "queue.Queue[typing.Any]" = queue.Queue()
+        self._loop = _get_websocket_loop()
+        self._receive_queue: "asyncio.Queue[Message]"
         self._send_queue: "queue.Queue[typing.Any]" = queue.Queue()
-        self._thread = threading.Thread(target=self._run)
-        self.send({"type": "websocket.connect"})
-        self._thread.start()
+        self._tasks: "typing.Set[asyncio.Task[typing.Any]]" = set()
+        self._future = asyncio.run_coroutine_threadsafe(self._run(), self._loop)
         message = self.receive()
         self._raise_on_close(message)
         self.accepted_subprotocol = message.get("subprotocol", None)
@@ -282,31 +413,41 @@ class WebSocketTestSession:
 
     def __exit__(self, *args: typing.Any) -> None:
         self.close(1000)
-        self._thread.join()
-        while not self._send_queue.empty():
-            message = self._send_queue.get()
-            if isinstance(message, BaseException):
-                raise message
-
-    def _run(self) -> None:
+        self._future.result()
+        try:
+            while True:
+                message = self._send_queue.get_nowait()
+                if isinstance(message, BaseException):
+                    raise message
+        except queue.Empty:
+            pass
+
+    async def _run(self) -> None:
         """
-        The sub-thread in which the websocket session runs.
+        The websocket session, run on the shared background event loop.
         """
-        loop = asyncio.new_event_loop()
+        # The queue must be created on the thread running the event loop.
+        self._receive_queue = asyncio.Queue()
+        self._receive_queue.put_nowait({"type": "websocket.connect"})
+        session_task = current_task(self._loop)
+        assert session_task is not None
+        _websocket_task_sessions[session_task] = self._tasks
         scope = self.scope
         receive = self._asgi_receive
         send = self._asgi_send
         try:
-            loop.run_until_complete(self.app(scope, receive, send))
+            await self.app(scope, receive, send)
         except BaseException as exc:
             self._send_queue.put(exc)
         finally:
-            loop.close()
+            # Don't let tasks left behind by the application outlive it.
+            tasks = list(self._tasks)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     async def _asgi_receive(self) -> Message:
-        while self._receive_queue.empty():
-            await asyncio.sleep(0)
-        return self._receive_queue.get()
+        return await self._receive_queue.get()
 
     async def _asgi_send(self, message: Message) -> None:
         self._send_queue.put(message)
@@ -315,18 +456,33 @@ class WebSocketTestSession:
         if message["type"] == "websocket.close":
             raise WebSocketDisconnect(message.get("code", 1000))
 
+    def _put_many(self, messages: typing.List[Message]) -> None:
+        for message in messages:
+            self._receive_queue.put_nowait(message)
+
     def send(self, message: Message) -> None:
-        self._receive_queue.put(message)
+        self._loop.call_soon_threadsafe(self._receive_queue.put_nowait, message)
+
+    def send_many(self, messages: typing.Iterable[Message]) -> None:
+        self._loop.call_soon_threadsafe(self._put_many, list(messages))
 
     def send_text(self, data: str) -> None:
         self.send({"type": "websocket.receive", "text": data})
 
+    def send_text_many(self, data: typing.Iterable[str]) -> None:
+        self.send_many([{"type": "websocket.receive", "text": text} for text in data])
+
     def send_bytes(self, data: bytes) -> None:
         self.send({"type": "websocket.receive", "bytes": data})
 
+    def send_bytes_many(self, data: typing.Iterable[bytes]) -> None:
+        self.send_many(
+            [{"type": "websocket.receive", "bytes": chunk} for chunk in data]
+        )
+
     def send_json(self, data: typing.Any, mode: str = "text") -> None:
         assert mode in ["text", "binary"]
-        text = json.dumps(data)
+        text = json.dumps(data, separators=(",", ":"))
         if mode == "text":
             self.send({"type": "websocket.receive", "text": text})
         else:
@@ -411,7 +567,8 @@ class TestClient(requests.Session):
         cert: typing.Union[str, typing.Tuple[str, str]] = None,
         json: typing.Any = None,
     ) -> requests.Response:
-        url = urljoin(self.base_url, url)
+        if not url.startswith(_ABSOLUTE_URL_PREFIXES):
+            url = urljoin(self.base_url, url)
         return super().request(
             method,
             url,
@@ -434,7 +591,8 @@ class TestClient(requests.Session):
     def websocket_connect(
         self, url: str, subprotocols: typing.Sequence[str] = None, **kwargs: typing.Any
     ) -> typing.Any:
-        url = urljoin("ws://testserver", url)
+        if not url.startswith(_ABSOLUTE_URL_PREFIXES):
+            url = urljoin("ws://testserver", url)
         headers = kwargs.get("headers", {})
         headers.setdefault("connection", "upgrade")
         headers.setdefault("sec-websocket-key", "testserver==")
@@ -452,7 +610,7 @@ class TestClient(requests.Session):
         return session
 
     def __enter__(self) -> "TestClient":
-        loop = asyncio.get_event_loop()
+        loop = _get_event_loop()
         self.send_queue: "asyncio.Queue[typing.Any]" = asyncio.Queue()
         self.receive_queue: "asyncio.Queue[typing.Any]" = asyncio.Queue()
         self.task = loop.create_task(self.lifespan())
@@ -460,7 +618,7 @@ class TestClient(requests.Session):
         return self
 
     def __exit__(self, *args: typing.Any) -> None:
-        loop = asyncio.get_event_loop()
+        loop = _get_event_loop()
         loop.run_until_complete(self.wait_shutdown())
 
     async def lifespan(self) -> None:
@@ -1,11 +1,13 @@
 import asyncio
+import threading
 
 import pytest
 
 from starlette.applications import Starlette
 from starlette.middleware import Middleware
-from starlette.responses import JSONResponse
-from starlette.testclient import TestClient
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.testclient import TestClient, _get_event_loop
 from starlette.websockets import WebSocket, WebSocketDisconnect
 
 mock_service = Starlette()
@@ -46,11 +48,43 @@ def test_use_testclient_in_endpoint():
     assert response.json() == {"mock": "example"}
 
 
+def test_testclient_with_closed_event_loop():
+    original_loop = _get_event_loop()
+    closed_loop = asyncio.new_event_loop()
+    closed_loop.close()
+    asyncio.set_event_loop(closed_loop)
+    try:
+        client = TestClient(mock_service)
+        response = client.get("/")
+        assert response.json() == {"mock": "example"}
+        new_loop = _get_event_loop()
+        assert new_loop is not closed_loop
+        new_loop.close()
+    finally:
+        asyncio.set_event_loop(original_loop)
+
+
 def test_use_testclient_as_contextmanager():
     with TestClient(app):
         pass
 
 
+def test_use_testclient_as_contextmanager_in_thread():
+    results = []
+
+    def run():
+        try:
+            with TestClient(mock_service) as client:
+                results.append(client.get("/").json())
+        finally:
+            _get_event_loop().close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert results == [{"mock": "example"}]
+
+
 def test_error_on_startup():
     with pytest.raises(RuntimeError):
         with TestClient(startup_error_app):
@@ -110,6 +144,27 @@ def test_testclient_asgi3():
     assert response.text == "Hello, world!"
 
 
+def test_testclient_headers_latin1():
+    async def app(scope, receive, send):
+        request = Request(scope, receive)
+        response = JSONResponse({"name": request.headers["x-name"]})
+        await response(scope, receive, send)
+
+    client = TestClient(app)
+    response = client.get("/", headers={"X-Name": "José"})
+    assert response.json() == {"name": "José"}
+
+
+def test_testclient_response_headers_latin1():
+    async def app(scope, receive, send):
+        response = PlainTextResponse("Hello", headers={"x-name": "José"})
+        await response(scope, receive, send)
+
+    client = TestClient(app)
+    response = client.get("/")
+    assert response.headers["x-name"] == "José"
+
+
 def test_websocket_blocking_receive():
     def app(scope):
         async def respond(websocket):
@@ -132,3 +187,36 @@ def test_websocket_blocking_receive():
     with client.websocket_connect("/") as websocket:
         data = websocket.receive_json()
         assert data == {"message": "test"}
+
+
+def test_websocket_concurrent_sessions():
+    async def app(scope, receive, send):
+        websocket = WebSocket(scope, receive=receive, send=send)
+        await websocket.accept()
+        messages = [await websocket.receive_text() for _ in range(3)]
+        await websocket.send_text(" ".join(messages))
+        await websocket.close()
+
+    client = TestClient(app)
+    with client.websocket_connect("/") as first:
+        with client.websocket_connect("/") as second:
+            for word in ("one", "two", "three"):
+                first.send_text(word)
+                second.send_text(word.upper())
+            assert second.receive_text() == "ONE TWO THREE"
+        assert first.receive_text() == "one two three"
+
+
+def test_websocket_session_cancels_leftover_tasks():
+    tasks = []
+
+    async def app(scope, receive, send):
+        websocket = WebSocket(scope, receive=receive, send=send)
+        await websocket.accept()
+        tasks.append(asyncio.ensure_future(asyncio.sleep(3600)))
+        await websocket.receive()
+
+    client = TestClient(app)
+    with client.websocket_connect("/"):
+        assert not tasks[0].done()
+    assert tasks[0].cancelled()
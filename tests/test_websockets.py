@@ -137,6 +137,42 @@ def test_websocket_send_and_receive_bytes():
         assert data == b"Message was: Hello, world!"
 
 
+def test_websocket_send_text_many():
+    def app(scope):
+        async def asgi(receive, send):
+            websocket = WebSocket(scope, receive=receive, send=send)
+            await websocket.accept()
+            data = [await websocket.receive_text() for _ in range(3)]
+            await websocket.send_text(", ".join(data))
+            await websocket.close()
+
+        return asgi
+
+    client = TestClient(app)
+    with client.websocket_connect("/") as websocket:
+        websocket.send_text_many(["one", "two", "three"])
+        data = websocket.receive_text()
+        assert data == "one, two, three"
+
+
+def test_websocket_send_bytes_many():
+    def app(scope):
+        async def asgi(receive, send):
+            websocket = WebSocket(scope, receive=receive, send=send)
+            await websocket.accept()
+            data = [await websocket.receive_bytes() for _ in range(3)]
+            await websocket.send_bytes(b", ".join(data))
+            await websocket.close()
+
+        return asgi
+
+    client = TestClient(app)
+    with client.websocket_connect("/") as websocket:
+        websocket.send_bytes_many(iter([b"one", b"two", b"three"]))
+        data = websocket.receive_bytes()
+        assert data == b"one, two, three"
+
+
 def test_websocket_send_and_receive_json():
     def app(scope):
         async def asgi(receive, send):
@@ -155,6 +191,24 @@ def test_websocket_send_and_receive_json():
         assert data == {"message": {"hello": "world"}}
 
 
+def test_websocket_send_json_compact():
+    def app(scope):
+        async def asgi(receive, send):
+            websocket = WebSocket(scope, receive=receive, send=send)
+            await websocket.accept()
+            data = await websocket.receive_text()
+            await websocket.send_text(data)
+            await websocket.close()
+
+        return asgi
+
+    client = TestClient(app)
+    with client.websocket_connect("/") as websocket:
+        websocket.send_json({"a": 1, "b": [1, 2]})
+        data = websocket.receive_text()
+        assert data == '{"a":1,"b":[1,2]}'
+
+
 def test_websocket_iter_text():
     def app(scope):
         async def asgi(receive, send):